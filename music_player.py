@@ -1,38 +1,301 @@
 import os
-import platform
-import pathlib
 import random
+import re
 import json
 import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 
 from kivy.app import App
-from kivy.properties import NumericProperty, StringProperty, ObjectProperty, ListProperty, DictProperty, BooleanProperty
+from kivy.properties import NumericProperty, StringProperty, ObjectProperty, BooleanProperty
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.core.audio import SoundLoader
 from kivy.clock import Clock
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.slider import Slider
 from kivy.uix.settings import SettingsWithSpinner
-from kivy.config import ConfigParser
 from kivy.config import Config
 
-from tinytag import TinyTag
+try:
+    import orjson  # optional, faster parsing of the cache files at startup
+except ImportError:
+    orjson = None
+
+try:
+    from kivy.core.audio.audio_sdl2 import SoundSDL2
+except ImportError:
+    SoundSDL2 = None
 
 Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
 
 if sys.platform == "win32":
     import ctypes
 
+# Resolved once: on Windows a seek only takes effect once the sound is playing
+SEEK_AFTER_PLAY = sys.platform == "win32"
+
+# Music file extensions, matched case-insensitively
+MUSIC_FILE_PATTERN = re.compile(r'\.(?:mp3|ogg|m4a|flac|wav)$', re.IGNORECASE)
+
+# Tag metadata cached per file; mtime_ns and size identify the version of the file it was read from
+TagInfo = namedtuple('TagInfo', ['mtime_ns', 'size', 'duration', 'title', 'genre', 'artist', 'album'])
+
+
+def iter_music_files(directory, dir_mtimes=None):
+    """Yield the path of each music file below directory.
+
+    Files are told apart from directories by the DirEntry, so no file is stat'ed,
+    and folders that can't be read are skipped.  If dir_mtimes is given, the mtime
+    of every directory visited is recorded in it, or None for a skipped folder.
+    """
+    stack = [directory]
+    while stack:
+        directory = stack.pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif MUSIC_FILE_PATTERN.search(entry.name) and entry.is_file():
+                        yield entry.path
+        except OSError as e:
+            print(f"Error reading {directory}: {e}")
+            if dir_mtimes is not None:
+                dir_mtimes[directory] = None  # never matches, so the next build scans again
+
+
+MP3_BITRATES = {  # kbit/s by bitrate index, for MPEG-1 and for MPEG-2/2.5 Layer III
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def read_header_duration(path):
+    """Return the duration in seconds read from the file header alone, or None.
+
+    Only wav, flac, mp3 and ogg are handled; for other formats, or when the header is
+    not understood, None is returned and the full tag parse works the duration out.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, 'rb') as f:
+            if extension == '.wav':
+                return wav_duration(f)
+            if extension == '.flac':
+                return flac_duration(f)
+            if extension == '.mp3':
+                return mp3_duration(f, os.fstat(f.fileno()).st_size)
+            if extension == '.ogg':
+                return ogg_duration(f, os.fstat(f.fileno()).st_size)
+    except (OSError, IndexError, ValueError, ZeroDivisionError):
+        pass
+    return None
+
+
+def wav_duration(f):
+    if f.read(4) != b'RIFF' or f.read(8)[4:] != b'WAVE':
+        return None
+    byte_rate = None
+    position = 12
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        size = int.from_bytes(chunk[4:], 'little')
+        if chunk[:4] == b'fmt ':
+            if size < 16:
+                return None  # too short for the format fields, so the file is malformed
+            byte_rate = int.from_bytes(f.read(16)[8:12], 'little')
+        elif chunk[:4] == b'data':
+            return size / byte_rate if byte_rate else None
+        # Seek from the chunk start, which always moves forward; chunks are padded to an even length
+        position += 8 + size + (size & 1)
+        f.seek(position)
+
+
+def flac_duration(f):
+    header = f.read(42)
+    if header[:4] != b'fLaC' or header[4] & 0x7f != 0:  # STREAMINFO is always the first block
+        return None
+    info = int.from_bytes(header[18:26], 'big')
+    sample_rate = info >> 44
+    total_samples = info & 0xfffffffff
+    return total_samples / sample_rate if sample_rate and total_samples else None
+
+
+def mp3_duration(f, file_size):
+    header = f.read(10)
+    audio_start = 0
+    if header[:3] == b'ID3':
+        audio_start = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+        if header[5] & 0x10:
+            audio_start += 10  # footer
+    f.seek(audio_start)
+    data = f.read(4096)
+    pos = data.find(b'\xff')
+    while 0 <= pos < len(data) - 4:
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version = (b1 >> 3) & 3
+        if (b1 & 0xe0 == 0xe0 and version != 1 and (b1 >> 1) & 3 == 1
+                and 0 < b2 >> 4 < 15 and (b2 >> 2) & 3 != 3):
+            break
+        pos = data.find(b'\xff', pos + 1)
+    else:
+        return None
+    mpeg1 = version == 3
+    sample_rate = MP3_SAMPLE_RATES[version][(b2 >> 2) & 3]
+    samples_per_frame = 1152 if mpeg1 else 576
+    mono = b3 >> 6 == 3
+    xing = pos + 4 + (17 if mpeg1 and mono else 32 if mpeg1 else 9 if mono else 17)
+    if data[xing:xing + 4] in (b'Xing', b'Info'):
+        if data[xing + 7] & 1:  # the frame count is present
+            frames = int.from_bytes(data[xing + 8:xing + 12], 'big')
+            return frames * samples_per_frame / sample_rate
+        return None
+    if data[pos + 36:pos + 40] == b'VBRI':
+        frames = int.from_bytes(data[pos + 50:pos + 54], 'big')
+        return frames * samples_per_frame / sample_rate
+    # No VBR header, so the stream is constant bitrate
+    bitrate = MP3_BITRATES[mpeg1][b2 >> 4] * 1000
+    return (file_size - audio_start - pos) * 8 / bitrate
+
+
+def ogg_duration(f, file_size):
+    # The first page holds the codec's identification header; the last page's granule position
+    # is the total number of samples
+    page = f.read(320)
+    if page[:4] != b'OggS':
+        return None
+    packet = page[27 + page[26]:]  # after the page header and its segment table
+    if packet[:7] == b'\x01vorbis':
+        sample_rate = int.from_bytes(packet[12:16], 'little')
+        pre_skip = 0
+    elif packet[:8] == b'OpusHead':
+        sample_rate = 48000  # Opus granule positions always count 48 kHz samples
+        pre_skip = int.from_bytes(packet[10:12], 'little')
+    else:
+        return None
+    f.seek(max(0, file_size - 65536))  # a page is at most 65307 bytes
+    tail = f.read()
+    last = tail.rfind(b'OggS')
+    if last < 0:
+        return None
+    granule = int.from_bytes(tail[last + 6:last + 14], 'little', signed=True)
+    if granule <= pre_skip:
+        return None
+    return (granule - pre_skip) / sample_rate
+
+
+@lru_cache(maxsize=None)
+def load_tinytag():
+    """Import tinytag on first use; return the module, or None if it is not installed."""
+    try:
+        import tinytag
+    except ImportError:
+        print("tinytag is not installed; songs are labelled with their file names")
+        return None
+    return tinytag
+
+
+@lru_cache(maxsize=4096)
+def secs_to_time_str(time_sec):
+    minutes, seconds = divmod(time_sec, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:02d}:{minutes:02d}:{seconds:02d}' if hours > 0 else f'{minutes:02d}:{seconds:02d}'
+
+
+@lru_cache(maxsize=4096)
+def song_label(selection, tag) -> str:
+    if all([tag.title is None, tag.genre is None, tag.artist is None, tag.album is None]):
+        return os.path.splitext(os.path.basename(selection))[0]
+    title = tag.title if tag.title is not None else "Title Unspecified"
+    genre = tag.genre if tag.genre is not None else "Genre Unspecified"
+    artist = tag.artist if tag.artist is not None else "Artist Unspecified"
+    album = tag.album if tag.album is not None else "Album Unspecified"
+
+    return title + ' / ' + genre + ' / ' + artist + ' / ' + album
+
+
+def read_json_file(path):
+    """Return the decoded contents of a JSON file, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+
+def write_json_file(path, data):
+    # Write to a temporary file first so an interrupted write never leaves a truncated cache behind
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing {path}: {e}")
+        return False
+
+
+class ProgressSlider(Slider):
+    """Slider that dispatches on_seek only when a touch it grabbed is released."""
+    __events__ = ('on_seek',)
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super(ProgressSlider, self).on_touch_up(touch)
+        super(ProgressSlider, self).on_touch_up(touch)
+        self.dispatch('on_seek')
+        return True
+
+    def on_seek(self):
+        pass
+
+
+class PlaylistView(RecycleView):
+    """RecycleView of SongButtons that dispatches on_song_press with the pressed song's index."""
+    __events__ = ('on_song_press',)
+
+    def on_song_press(self, song_index):
+        pass
+
+
+class SongButton(RecycleDataViewBehavior, Button):
+    """Playlist button that knows the index of its song; -1 marks the music directory prompt."""
+    song_index = NumericProperty(0)
+    playlist_view = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.playlist_view = rv
+        return super(SongButton, self).refresh_view_attrs(rv, index, data)
+
+    def on_press(self):
+        self.playlist_view.dispatch('on_song_press', self.song_index)
+
 
 class MusicPlayer(BoxLayout):
     INIT_POS_DUR = '0:00 / 0:00'
     INIT_SONG_TITLE = 'Click on Play or Select Song Title Above'
     INIT_MUSIC_SELECTION = 'A valid dance music directory is needed.  Click here or use Music Settings button'
     SONG_BTN_BCKGRD = (0.5, 0.5, 0.5, 1)
+    SONG_ROW_HEIGHT = 40
 
     sound = ObjectProperty(None, allownone=True)
     music_file = StringProperty(None)
@@ -45,7 +308,7 @@ class MusicPlayer(BoxLayout):
     song_title = StringProperty(INIT_SONG_TITLE)
     play_single_song = BooleanProperty(False)
 
-    practice_dances = DictProperty({
+    practice_dances = {
         "default": ['Waltz', 'Tango', 'VWSlow', 'VienneseWaltz', 'Foxtrot', 'QuickStep',
                     'WCS', 'Samba', 'ChaCha', 'Rumba', 'PasoDoble', 'JSlow', 'Jive'],
         "beginner": ["Waltz", "JSlow", "Jive", "Rumba", "Foxtrot", "ChaCha", "Tango"],
@@ -54,13 +317,30 @@ class MusicPlayer(BoxLayout):
         "LineDance": ["LineDance"],
         "misc": ["AmericanRumba", "ArgentineTango", "Bolero", "DiscoFox", "Hustle", "LindyHop", "Mambo", "Merengue",
                  "NC2Step", "Polka", "Salsa"]
-    })
+    }
+
+    # Lower case names of the folders scan_all_dances looks in; any other folder in the music directory is skipped
+    dance_folders = frozenset(name.lower() for names in practice_dances.values() for name in names)
 
-    playlist = ListProperty([])
     playlist_idx = NumericProperty(0)
-    dances = ListProperty([])
     practice_type = StringProperty('60min')
     num_selections = NumericProperty(2)
+    # Per-dance adjustments to the number of selections, either a table from the requested
+    # number to the adjusted number (with an optional 'default') or a named rule
+    selection_adjustments = {
+        'PasoDoble': {0: 0, 1: 0, 2: 1, 3: 1, 'default': 2},
+        'VWSlow': 'cap_at_1',
+        'JSlow': 'cap_at_1',
+        'VienneseWaltz': 'n-1',
+        'Jive': 'n-1',
+        'WCS': 'cap_at_2',
+        'LineDance': {'default': 100},  # include all the line dances
+    }
+    selection_rules = {
+        'n-1': lambda n: n - 1 if n > 1 else n,
+        'cap_at_1': lambda n: 1 if n > 1 else n,
+        'cap_at_2': lambda n: 2 if n > 2 else n,
+    }
     song_max_playtime = 210  # music selections longer than 210 (3m30s) are faded out
     fade_time = 10  # 10s fade out
 
@@ -100,27 +380,83 @@ class MusicPlayer(BoxLayout):
             "options": ["60min", "NC 60min", "B 60min", "90min", "NC 90min", "120min", "NC 120min", "LineDance", "Misc"]
         }
     ]
+    settings_by_key = {item["key"]: item for item in settings_json}
+    practice_types = frozenset(settings_by_key['practice_type']['options'])
 
     script_path = os.path.dirname(os.path.abspath(__file__))
-
-    current_button = None  # Track the currently playing song's button
-    song_buttons = []  # Store the buttons for all songs
+    announce_dir = os.path.join(script_path, 'announce')
 
     def __init__(self, **kwargs):
         super(MusicPlayer, self).__init__(**kwargs)
         self.sound = None
         self.playing_position = 0
-        self.total_time = 0
-        self.schedule_interval = 0.1
-
+        self.total_time_suffix = ''  # ' / <total time>' appended to the position in progress_text
+        self.current_song_title = self.INIT_SONG_TITLE
+        self.playlist = []
+        self.dances = []
+        self.rng = random.Random()  # the player's own generator; seed it for a repeatable playlist
+        self.probed_sound = None  # the sound that progress_max and total_time_suffix were set for
+        self.schedule_interval = 0.5  # progress updates while playing
+        self.volume_step = 1 / 256  # smallest fade volume change written to the sound
+        self.fade_interval = 0.25  # finer progress updates while fading out; 40 volume steps over a 10s fade
+        self.progress_interval = None
+        self.fade_start = self.fine_poll_at = self.preload_at = self.song_end = float('inf')  # see set_song_limits
+        self.progress_second = -1  # last whole second written to the progress bar and label
+        self.window_visible = True  # False while the window is minimized and the progress can't be seen
+        self.play_t0 = 0  # monotonic time at which the playing song was at position 0
+        self.pos_sync_time = 0  # monotonic time of the next sound.get_pos() resync
+        self.pos_sync_interval = 5
+        self.loader = ThreadPoolExecutor(max_workers=1)
+        self.load_request = 0  # incremented to cancel a song load that is still running
+        self.preload = None  # (playlist index, path, future) of the next song, loaded ahead of time
+        self.preload_lead = 10  # start loading the next song this many seconds before the current one ends
+        self.scanner = ThreadPoolExecutor(max_workers=1)
+        self.building_playlist = False  # True from update_playlist until apply_playlist shows the result
+        self.tagger = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2))
+        self.tags_pending = 0
+        self.tag_futures = []
+        self.tag_results = deque()  # (generation, index, tag) from the tagger threads, drained on the Kivy thread
+        self.tag_results_trigger = Clock.create_trigger(self.show_song_labels)
+        self.playlist_generation = 0  # incremented to discard labels for a replaced playlist
+        self.playlist_file_keys = []  # (mtime_ns, size) per playlist entry, None if it couldn't be stat'ed
+        self.announce_paths = self.find_announcements()  # lower case dance name -> announcement file
+        # dance -> callable mapping the requested number of selections to the adjusted number
+        self.selection_adjusters = {dance: self.compile_adjustment(rule)
+                                    for dance, rule in self.selection_adjustments.items()}
+        # Held while the tag cache or music index is changed by a worker thread or copied for saving
+        self.cache_lock = threading.RLock()
+        self.tag_cache = {}  # path -> TagInfo
+        self.tag_cache_dirty = False
+        # lower case dance folder name -> [path, ...]; files are stat'ed when picked, not when indexed,
+        # as editing a file's tags in place doesn't change its directory's mtime
+        self.music_index = {}
+        self.music_index_dir = None
+        self.music_index_dir_mtimes = {}  # directory -> mtime_ns when music_index was built
+        self.cache_dir = None  # where the tag cache is kept between sessions
+        self.error_popup = None  # built by the first show_error_popup and reused after that
+        self.error_label = None
+        self.error_messages = deque(maxlen=10)  # shown in the open error popup, oldest dropped first
+
+        self.app = App.get_running_app()
+        self.current_button_idx = None  # Track the currently playing song's row
+        self.colored_button_idxs = set()  # rows not in SONG_BTN_BCKGRD, so a reset only touches those
         self.orientation = 'vertical'
 
-        # Create ScrollView and GridLayout for playlist buttons
-        self.scrollview = ScrollView(size_hint=(1, 1), size=(self.width, 400))
-        self.button_grid = GridLayout(cols=1, size_hint_y=None)
-        self.button_grid.bind(minimum_height=self.button_grid.setter('height'))
-        self.scrollview.add_widget(self.button_grid)
-        self.add_widget(self.scrollview)
+        # The playlist is a RecycleView, so only the rows on screen have a SongButton widget;
+        # each row is described by a {'text', 'song_index', 'background_color'} dict in its data
+        self.playlist_view = PlaylistView(size_hint=(1, 1), size=(self.width, 400))
+        self.playlist_view.viewclass = SongButton
+        playlist_layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None,
+                                           default_size=(None, self.SONG_ROW_HEIGHT), default_size_hint=(1, None))
+        playlist_layout.bind(minimum_height=playlist_layout.setter('height'))
+        self.playlist_view.add_widget(playlist_layout)
+        self.playlist_view.bind(on_song_press=self.on_song_button_press)
+        self.show_song_trigger = Clock.create_trigger(self.show_current_song)
+        self.progress_event = Clock.create_trigger(self.update_progress, self.schedule_interval, interval=True)
+        # Importing it creates the window, so it must follow Config.set
+        from kivy.core.window import Window
+        Window.bind(on_minimize=self.on_window_minimize, on_restore=self.on_window_restore)
+        self.add_widget(self.playlist_view)
 
         # Volume and control layout
         volume_and_controls = BoxLayout(orientation='horizontal', height="125dp", size_hint_y=None)
@@ -130,7 +466,8 @@ class MusicPlayer(BoxLayout):
         self.volume_slider = Slider(min=0.0, max=1.0, value=self.volume, orientation='vertical', size_hint_y=1,
                                     height=125, value_track=True, value_track_color=(0.3, 0.8, 0.3, 1))
         self.volume_slider.bind(value=self.set_volume)
-        self.volume_label = Label(text="Vol: " + str(int(100 * self.volume)) + "%", size_hint_x=1, width=30,
+        self.volume_pct = int(100 * self.volume)
+        self.volume_label = Label(text="Vol: " + str(self.volume_pct) + "%", size_hint_x=1, width=30,
                                   color=(0.3, 0.8, 0.3, 1))
         volume_layout.add_widget(self.volume_label)
         volume_layout.add_widget(self.volume_slider)
@@ -143,12 +480,12 @@ class MusicPlayer(BoxLayout):
         self.song_title_label = Label(text=self.song_title, color=(0, 1, 0, 1))  # Green text
         self.bind(song_title=self.song_title_label.setter('text'))
         controls.add_widget(self.song_title_label)
-        self.progress_bar = Slider(min=0, max=self.progress_max, value=self.progress_value, step=1,
-                                   cursor_size=(0, 0), value_track=True, value_track_width=4, size_hint_x=1,
-                                   value_track_color=(0.3, 0.8, 0.3, 1))
+        self.progress_bar = ProgressSlider(min=0, max=self.progress_max, value=self.progress_value, step=1,
+                                           cursor_size=(0, 0), value_track=True, value_track_width=4,
+                                           size_hint_x=1, value_track_color=(0.3, 0.8, 0.3, 1))
         self.bind(progress_max=self.progress_bar.setter('max'))
         self.bind(progress_value=self.progress_bar.setter('value'))
-        self.progress_bar.bind(on_touch_up=self.on_slider_move)
+        self.progress_bar.bind(on_seek=self.on_slider_move)
         controls.add_widget(self.progress_bar)
         self.progress_label = Label(text=self.progress_text, color=(0, 1, 0, 1))
         self.bind(progress_text=self.progress_label.setter('text'))
@@ -173,11 +510,11 @@ class MusicPlayer(BoxLayout):
         control_buttons.add_widget(restart_button)
 
         playlist_button = Button(text="New Playlist", background_color=(0.2, 0.6, 0.8, 1), color=(1, 1, 1, 1))
-        playlist_button.bind(on_press=lambda instance: self.update_playlist(self.music_dir))
+        playlist_button.bind(on_press=self.new_playlist)
         control_buttons.add_widget(playlist_button)
 
         settings_button = Button(text="Music Settings", background_color=(0.2, 0.6, 0.8, 1), color=(1, 1, 1, 1))
-        settings_button.bind(on_press=lambda instance: App.get_running_app().open_settings())
+        settings_button.bind(on_press=self.open_settings)
         control_buttons.add_widget(settings_button)
 
         controls.add_widget(control_buttons)
@@ -190,6 +527,12 @@ class MusicPlayer(BoxLayout):
         if not self.playlist and self.music_dir:
             self.update_playlist(self.music_dir)
 
+    def new_playlist(self, instance=None):
+        self.update_playlist(self.music_dir, rescan=True)
+
+    def open_settings(self, instance=None):
+        self.app.open_settings()
+
     def get_dances(self, list_name):
         try:
             return self.practice_dances[list_name]
@@ -197,81 +540,180 @@ class MusicPlayer(BoxLayout):
             return self.practice_dances["default"]
 
     def play_sound(self, instance=None):
-        # Check if there are songs in the playlist
-        if self.playlist and self.playlist_idx < len(self.playlist):
-            current_song_path = self.playlist[self.playlist_idx]
-
-            # Check if the song file exists
-            if not os.path.exists(current_song_path):
-                # If the file does not exist, show an error message and skip to the next song
-                self.show_error_popup(f"Song file not found: {current_song_path}")
-                self.playlist_idx += 1  # Move to the next song
-                if self.playlist_idx < len(self.playlist):
-                    self.play_sound()  # Try playing the next song
-                return
-
-        # Load and play the song if the file exists
-        if self.sound is None and self.playlist:
-            self.sound = SoundLoader.load(self.playlist[self.playlist_idx])
-
-        if self.sound:
-            if self.sound.state == 'play':
-                self.playing_position = self.sound.get_pos()
-            if self.sound and self.sound.state != 'stop':
-                self.sound.stop()
-            self.sound.volume = self.volume
+        if self.sound is None:
+            # Check if there are songs in the playlist, then load the current one in the background;
+            # while a new playlist is being built the old one is about to be replaced, so wait
+            if self.playlist and self.playlist_idx < len(self.playlist) and not self.building_playlist:
+                self.load_song(self.playlist_idx)
+            return
+
+        if self.sound.state == 'play':
+            self.playing_position = self.sound.get_pos()
+        if self.sound and self.sound.state != 'stop':
+            self.sound.stop()
+        self.sound.volume = self.volume
 
-            Clock.unschedule(self.update_progress)
+        if self.sound is not self.probed_sound:
+            # Length, title and total time only change with the song, not on resuming from a pause
+            duration, label = self.probe(self.playlist[self.playlist_idx])
             if self.sound.length is not None and self.sound.length > 0:
                 self.progress_max = round(self.sound.length)
             else:
-                self.progress_max = round(self.song_duration(self.playlist[self.playlist_idx]))
-
-            self.total_time = self.secs_to_time_str(time_sec=self.progress_max)
-            self.song_title = self.song_label(self.playlist[self.playlist_idx])[:90]
-
-            # Reset the previous button to default color (white)
-            if hasattr(self, 'current_button') and self.current_button:
-                self.current_button.background_color = (1, 1, 1, 1)
-
-            # Get the current button and change its background color
-            self.current_button = self.song_buttons[self.playlist_idx]
-            self.current_button.background_color = (0, 1, 1, 1)  # Highlight the button (RGB with opacity)
-
-            # Scroll so the current button is visible
-            if self.playlist_idx < len(self.song_buttons) - 2:
-                self.scrollview.scroll_to(self.song_buttons[self.playlist_idx + 2])
-            elif self.playlist_idx < len(self.song_buttons) - 1:
-                self.scrollview.scroll_to(self.song_buttons[self.playlist_idx + 1])
-
-            Clock.schedule_interval(self.update_progress, self.schedule_interval)
-
-            if platform.system() == 'Windows':
-                self.sound.play()
+                self.progress_max = round(duration)
+            self.current_song_title = label[:90]
+            self.total_time_suffix = ' / ' + secs_to_time_str(int(self.progress_max))
+            self.probed_sound = self.sound
+        self.set_song_limits()
+        self.show_song_trigger()
+
+        self.progress_second = -1
+        self.schedule_progress(self.schedule_interval)
+
+        # A stopped or new sound already starts at 0, so only a resume needs the seek
+        if SEEK_AFTER_PLAY:
+            self.sound.play()
+            if self.playing_position:
                 self.sound.seek(self.playing_position)
-            else:
+        else:
+            if self.playing_position:
                 self.sound.seek(self.playing_position)
-                self.sound.play()
+            self.sound.play()
+        self.set_play_clock(self.playing_position)
+
+    def show_current_song(self, dt):
+        # Title, highlight and scroll updates for the playing song, applied together once per frame
+        if self.sound is None or self.playlist_idx >= len(self.playlist):
+            return
+        self.song_title = self.current_song_title
+
+        self.update_song_button_highlight()
+
+        # Scroll so the current button is visible
+        self.scroll_to_song(min(self.playlist_idx + 2, len(self.playlist) - 1))
+
+    def scroll_to_song(self, index):
+        # Scroll the least distance that brings the row at index into view, like ScrollView.scroll_to
+        view = self.playlist_view
+        overflow = len(view.data) * self.SONG_ROW_HEIGHT - view.height
+        if overflow <= 0:
+            return
+        row_top = index * self.SONG_ROW_HEIGHT
+        top = (1 - view.scroll_y) * overflow  # content hidden above the viewport
+        if row_top < top:
+            top = row_top
+        elif row_top + self.SONG_ROW_HEIGHT > top + view.height:
+            top = row_top + self.SONG_ROW_HEIGHT - view.height
+        else:
+            return
+        view.scroll_y = 1 - top / overflow
+
+    def set_song_row(self, index, **attrs):
+        data = self.playlist_view.data
+        if 0 <= index < len(data):
+            data[index] = dict(data[index], **attrs)
+
+    def load_song(self, index):
+        # Load on the loader thread; song_loaded applies the result on the Kivy thread
+        self.load_request += 1
+        request = self.load_request
+        selection = self.playlist[index]
+        future = self.take_preload(index, selection)
+        if future is None:
+            future = self.loader.submit(self.prepare_song, selection)
+        elif future.done():
+            # The next song was preloaded in time, so start it now rather than a frame later
+            self.song_loaded(request, index, selection, future, 0)
+            return
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(partial(self.song_loaded, request, index, selection, f), 0))
+
+    def preload_next_song(self):
+        # Start loading the song after the current one so it is ready when this one ends
+        index = self.playlist_idx + 1
+        if self.preload is not None or index >= len(self.playlist):
+            return
+        selection = self.playlist[index]
+        self.preload = (index, selection, self.loader.submit(self.prepare_song, selection))
+
+    def take_preload(self, index, selection):
+        # Return the preloaded future if it is for this song; any other preload is discarded
+        if self.preload is None:
+            return None
+        preload_index, preload_selection, future = self.preload
+        self.preload = None
+        if preload_index == index and preload_selection == selection:
+            return future
+        if not future.cancel():
+            future.add_done_callback(lambda f: Clock.schedule_once(partial(self.unload_preload, f), 0))
+        return None
+
+    def unload_preload(self, future, dt):
+        try:
+            sound = future.result()
+        except Exception:
+            return  # the error is reported if the song is loaded again to be played
+        if sound:
+            sound.unload()
+
+    def prepare_song(self, selection):
+        if not os.path.exists(selection):
+            raise FileNotFoundError(selection)
+        self.get_tag(selection)  # cache duration and label for play_sound
+        return SoundLoader.load(selection)
+
+    def song_loaded(self, request, index, selection, future, dt):
+        try:
+            sound = future.result()
+        except FileNotFoundError:
+            sound = None
+            missing = True
+        except Exception as e:
+            print(f"Error loading {selection}: {e}")
+            sound = None
+            missing = False
+        else:
+            missing = False
+
+        if request != self.load_request:
+            # The load was cancelled or superseded while it was running
+            if sound:
+                sound.unload()
+            return
+
+        if sound:
+            if self.sound is not None:
+                self.sound.unload()  # never leave a replaced sound playing
+            self.sound = sound
+            self.play_sound()
+        elif missing:
+            # If the file does not exist, show an error message and skip to the next song
+            self.show_error_popup(f"Song file not found: {selection}")
+            self.playlist_idx = index + 1  # Move to the next song
+            if self.playlist_idx < len(self.playlist):
+                self.play_sound()  # Try playing the next song
         else:
             # If sound couldn't be loaded, show an error popup and skip to the next song
-            self.show_error_popup(f"Could not load song: {self.playlist[self.playlist_idx]}")
-            self.playlist_idx += 1
+            self.show_error_popup(f"Could not load song: {selection}")
+            self.playlist_idx = index + 1
             if self.playlist_idx < len(self.playlist):
                 self.play_sound()
             else:
                 self.restart_playlist()
 
     def pause_sound(self, instance=None):
+        self.load_request += 1  # don't start a song that is still loading
         if self.sound and self.sound.state == 'play':
             self.playing_position = self.sound.get_pos()
             if self.sound:
                 self.sound.stop()
+            self.unschedule_progress()  # nothing to update until play_sound resumes
 
     def stop_sound(self, instance=None):
+        self.load_request += 1
         if self.sound:
             self.sound.stop()
             self.sound.unload()
-            Clock.unschedule(self.update_progress)
+            self.unschedule_progress()
             self.progress_value = 0
             self.playing_position = 0
             self.progress_text = self.INIT_POS_DUR
@@ -279,9 +721,14 @@ class MusicPlayer(BoxLayout):
 
     def restart_sound(self, instance=None):
         if self.sound:
-            self.sound.stop()
             self.playing_position = 0
-            self.sound.play()
+            if self.sound.state == 'play' and not (SoundSDL2 and isinstance(self.sound, SoundSDL2)):
+                # Seeking keeps the decoder pipeline primed; SDL2 can't seek so it is stopped instead
+                self.sound.seek(0)
+                self.set_play_clock(0)
+            else:
+                self.sound.stop()
+                self.play_sound()
 
     def set_volume(self, slider, volume):
         self.volume = volume
@@ -289,259 +736,577 @@ class MusicPlayer(BoxLayout):
             self.sound.volume = volume
 
     def update_volume_label(self, instance, value):
-        self.volume_label.text = f"Vol: {int(value * 100)}%"
+        volume_pct = int(value * 100)
+        if volume_pct != self.volume_pct:
+            self.volume_pct = volume_pct
+            self.volume_label.text = f"Vol: {volume_pct}%"
 
     def show_error_popup(self, message):
+        if self.error_popup is None:
+            self.build_error_popup()
+        if self.error_popup.parent is None:
+            self.error_messages.clear()
+        # If it is already open, e.g. several missing songs skipped in a row, this message is listed too
+        self.error_messages.append(message)
+        self.error_label.text = '\n'.join(self.error_messages)
+        if self.error_popup.parent is None:
+            self.error_popup.open()
+
+    def build_error_popup(self):
         # Create a label that supports text wrapping
-        label = Label(text=message,
-                      text_size=(380, None),  # 380 is slightly smaller than the popup width
-                      size_hint_y=None,
-                      color=(1, 1, 1, 1))  # white text
+        self.error_label = Label(size_hint_y=None,
+                                 color=(1, 1, 1, 1))  # white text
 
         # Set the label height based on the content to ensure it adjusts to long text
-        label.bind(texture_size=label.setter('size'))
+        self.error_label.bind(texture_size=self.error_label.setter('size'))
+
+        # Scroll the messages, wrapped to the width of the scroll view
+        messages_view = ScrollView(do_scroll_x=False)
+        messages_view.bind(width=lambda view, width: setattr(self.error_label, 'text_size', (width, None)))
+        messages_view.add_widget(self.error_label)
 
         # Create a "Close" button
         close_button = Button(text="Close", background_color=(0.7, 0.7, 0.7, 1),
-                              color=(0, 0, 0, 1))  # Gray button with black text
+                              color=(0, 0, 0, 1),  # Gray button with black text
+                              size_hint_y=None, height=40)
 
-        # Create a layout to hold both the label and button
+        # Create a layout to hold both the messages and button
         layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        layout.add_widget(label)
+        layout.add_widget(messages_view)
         layout.add_widget(close_button)
 
         # Create the popup
-        popup = Popup(title="Error",
-                      content=layout,
-                      size_hint=(None, None),
-                      size=(400, 200))
+        self.error_popup = Popup(title="Error",
+                                 content=layout,
+                                 size_hint=(None, None),
+                                 size=(400, 200))
 
         # Bind the close button to dismiss the popup
-        close_button.bind(on_press=popup.dismiss)
-
-        # Open the popup
-        popup.open()
+        close_button.bind(on_press=self.error_popup.dismiss)
 
-    def on_slider_move(self, instance, touch):
-        if self.sound and instance.collide_point(*touch.pos):
+    def on_slider_move(self, instance):
+        if self.sound:
             self.playing_position = self.progress_bar.value
             self.sound.seek(self.playing_position)
+            self.set_play_clock(self.playing_position)
+
+    def set_play_clock(self, position):
+        # Track the position with the monotonic clock between get_pos() resyncs
+        now = time.monotonic()
+        self.play_t0 = now - position
+        self.pos_sync_time = now + self.pos_sync_interval
+
+    def schedule_progress(self, interval):
+        self.progress_event.timeout = interval
+        if not self.progress_event.is_triggered:
+            self.progress_event()
+        self.progress_interval = interval
+
+    def unschedule_progress(self):
+        self.progress_event.cancel()
+        self.progress_interval = None
+        self.progress_second = -1
+
+    def set_song_limits(self):
+        # Positions at which update_progress acts
+        fades = self.fade_time > 0
+        self.fade_start = self.song_max_playtime if fades else float('inf')
+        self.preload_at = min(self.song_max_playtime, self.progress_max) - self.preload_lead
+        self.song_end = min(self.progress_max - 1, self.song_max_playtime + self.fade_time)
+        # Finer polling also covers the last second before song_end
+        fine_poll_at = self.song_max_playtime - self.schedule_interval if fades else float('inf')
+        self.fine_poll_at = min(fine_poll_at, self.song_end - 1)
 
     def update_progress(self, dt):
-        if self.sound is not None and self.sound.state == 'play':
+        if self.sound is None:
+            return
+        if self.sound.state != 'play':
+            # The song reached its end and stopped by itself before a tick saw it at song_end;
+            # pause_sound and stop_sound unschedule these updates, so they don't get here
+            if not self.play_single_song and self.progress_interval is not None:
+                self.next_song()
+            return
+        now = time.monotonic()
+        if now >= self.pos_sync_time:
             self.playing_position = self.sound.get_pos()
-            self.progress_value = round(self.playing_position)
-            current_time = self.secs_to_time_str(time_sec=self.playing_position)
-            self.progress_text = f'{current_time} / {self.total_time}'
-            if not self.play_single_song:
-                if self.playing_position >= self.song_max_playtime and self.fade_time > 0:
-                    self.sound.volume = self.sound.volume * (1 + self.schedule_interval * (
-                            self.song_max_playtime - self.playing_position) / self.fade_time)
-                if self.playing_position >= self.progress_max - 1 or self.playing_position > self.song_max_playtime + self.fade_time:
-                    self.sound.unload()
-                    self.playlist_idx += 1
-                    self.playing_position = 0
-                    if self.playlist_idx < len(self.playlist):
-                        self.sound = None
-                        self.play_sound()
-                    else:
-                        self.restart_playlist()
+            self.set_play_clock(self.playing_position)
+        else:
+            self.playing_position = now - self.play_t0
+        # The bar and label only show whole seconds, so skip the property writes in between
+        second = int(self.playing_position)
+        if second != self.progress_second and self.window_visible:
+            self.progress_second = second
+            self.progress_value = second
+            self.progress_text = secs_to_time_str(second) + self.total_time_suffix
+        if not self.play_single_song:
+            position = self.playing_position
+            # Poll more often from just before the fade out starts so the volume ramps smoothly,
+            # and near the end of the song so it is not played past
+            interval = self.fade_interval if position >= self.fine_poll_at else self.schedule_interval
+            if interval != self.progress_interval:
+                self.schedule_progress(interval)
+            if position >= self.preload_at:
+                self.preload_next_song()
+            if position >= self.fade_start:
+                # Linear in position from the user's volume down to silence over fade_time
+                volume = self.volume * max(0.0, 1 - (position - self.fade_start) / self.fade_time)
+                # Each volume write reaches the audio backend, so skip steps too small to hear
+                if volume == 0 or abs(volume - self.sound.volume) >= self.volume_step:
+                    self.sound.volume = volume
+            if position >= self.song_end:
+                self.next_song()
+
+    def next_song(self):
+        self.sound.unload()
+        self.playlist_idx += 1
+        self.playing_position = 0
+        if self.playlist_idx < len(self.playlist):
+            self.sound = None
+            self.play_sound()
+        else:
+            self.restart_playlist()
+
+    def on_window_minimize(self, window):
+        # Fading and advancing carry on, only the progress bar and label stop being written
+        self.window_visible = False
+
+    def on_window_restore(self, window):
+        self.window_visible = True
+        self.progress_second = -1  # bring the bar and label up to date on the next tick
 
-    def on_song_button_press(self, index):
+    def on_song_button_press(self, instance, song_index):
+        if song_index < 0:
+            self.open_settings()
+            return
         if self.sound:
             self.sound.unload()
         self.playing_position = 0
-        self.playlist_idx = index
+        self.playlist_idx = song_index
         self.sound = None
         self.play_sound()
 
-    def secs_to_time_str(self, time_sec):
-        hours = int(time_sec // 3600)
-        minutes = int((time_sec % 3600) // 60)
-        seconds = int(time_sec % 60)
-        return f'{hours:02d}:{minutes:02d}:{seconds:02d}' if hours > 0 else f'{minutes:02d}:{seconds:02d}'
+    def update_song_button_highlight(self):
+        # Only the previously and newly highlighted buttons change color; resuming the same song changes none
+        if self.current_button_idx == self.playlist_idx:
+            return
+        if self.current_button_idx is not None:
+            self.set_song_row(self.current_button_idx, background_color=(1, 1, 1, 1))  # played songs are white
+        self.current_button_idx = self.playlist_idx
+        self.set_song_row(self.playlist_idx, background_color=(0, 1, 1, 1))  # Highlight the button (RGB with opacity)
+        self.colored_button_idxs.add(self.playlist_idx)
 
     def restart_playlist(self, instance=None):
+        self.load_request += 1
+        self.show_song_trigger.cancel()
         if self.sound:
             self.sound.unload()
-        Clock.unschedule(self.update_progress)
+        self.unschedule_progress()
         self.progress_value = 0
         self.playing_position = 0
         self.progress_text = self.INIT_POS_DUR
         self.playlist_idx = 0
         self.song_title = self.INIT_SONG_TITLE
-        for btn in self.song_buttons:
-            btn.background_color = self.SONG_BTN_BCKGRD
-        if hasattr(self, 'current_button') and self.current_button:
-            self.current_button = self.song_buttons[self.playlist_idx]
-            self.current_button.background_color = (0, 1, 1, 1)
-            self.scrollview.scroll_to(self.current_button)
+        for i in self.colored_button_idxs:
+            self.set_song_row(i, background_color=self.SONG_BTN_BCKGRD)
+        self.colored_button_idxs.clear()
+        if self.current_button_idx is not None and self.playlist:
+            self.current_button_idx = self.playlist_idx
+            self.set_song_row(self.playlist_idx, background_color=(0, 1, 1, 1))
+            self.colored_button_idxs.add(self.playlist_idx)
+            self.scroll_to_song(self.playlist_idx)
         self.sound = None
 
-    def update_playlist(self, directory, instance=None):
+    def update_playlist(self, directory, instance=None, rescan=False):
+        self.playlist_generation += 1
+        generation = self.playlist_generation
+        for future in self.tag_futures:
+            future.cancel()
+        self.tag_futures = []
+        self.tags_pending = 0
+        self.take_preload(None, None)
+        self.stop_sound()
+        # Scan and pick songs on the scanner thread; apply_playlist shows the result
+        self.building_playlist = True
+        future = self.scanner.submit(self.build_playlist, directory, self.dances, self.num_selections, rescan)
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(partial(self.apply_playlist, generation, directory, f), 0))
+
+    def build_playlist(self, directory, dances, num_selections, rescan=False):
+        playlist = []
+        music_index = self.scan_all_dances(directory, rescan)
+        for dance in dances:
+            playlist.extend(self.get_songs(music_index, dance, num_selections))
+        playlist_file_keys = []
+        for path in playlist:
+            try:
+                stat = os.stat(path)
+                playlist_file_keys.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                playlist_file_keys.append(None)
+        return playlist, playlist_file_keys
+
+    def apply_playlist(self, generation, directory, future, dt):
+        if generation != self.playlist_generation:
+            return  # a newer update_playlist has been requested
+        self.building_playlist = False
+        try:
+            playlist, playlist_file_keys = future.result()
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            playlist, playlist_file_keys = [], []
         if self.sound:
             self.sound.unload()
-        self.playlist = []
-        for dance in self.dances:
-            self.playlist.extend(self.get_songs(directory, dance, self.num_selections))
+        self.playlist = playlist
+        self.playlist_file_keys = playlist_file_keys
         self.playlist_idx = 0
         self.sound = None
         self.display_playlist(self.playlist)
         self.restart_playlist()
 
     def display_playlist(self, playlist):
-        self.button_grid.clear_widgets()
-        self.song_buttons = []  # Clear the buttons list
+        self.colored_button_idxs.clear()  # every row below is given its initial color
         if len(self.playlist) == 0:
-            btn = Button(text=self.INIT_MUSIC_SELECTION, size_hint_y=None, height=40,
-                         background_color=(1, 0, 0, 1), color=(1, 1, 1, 1))
-            btn.bind(on_press=lambda instance: App.get_running_app().open_settings())
-            self.song_buttons.append(btn)  # Store the button in the list
-            self.button_grid.add_widget(btn)
+            self.playlist_view.data = [{'text': self.INIT_MUSIC_SELECTION, 'song_index': -1,
+                                        'background_color': (1, 0, 0, 1)}]
+            return
+
+        rows = []
+        untagged = []
+        for i in range(len(self.playlist)):
+            # Show the file name until the tags have been read in the background
+            path = self.playlist[i]
+            file_key = self.playlist_file_keys[i] if i < len(self.playlist_file_keys) else None
+            tag = self.cached_tag(path, file_key)
+            if tag is not None:
+                label = song_label(path, tag)
+            else:
+                label = os.path.splitext(os.path.basename(path))[0]
+                untagged.append((i, path, file_key))
+            rows.append({'text': label, 'song_index': i, 'background_color': self.SONG_BTN_BCKGRD})
+        self.playlist_view.data = rows
+        self.tags_pending = len(untagged)
+        for index, path, file_key in untagged:
+            self.tag_futures.append(
+                self.tagger.submit(self.tag_song, self.playlist_generation, index, path, file_key))
+        if not untagged:
+            self.save_caches()
+
+    def tag_song(self, generation, index, path, file_key):
+        # Runs on a tagger thread; results are queued and the Kivy thread applies them in batches
+        if generation != self.playlist_generation:
+            return
+        try:
+            tag = self.get_tag(path, file_key)
+        except Exception as e:  # reported either way so tags_pending reaches 0
+            print(f"Error reading tags of {path}: {e}")
+            tag = None
+        self.tag_results.append((generation, index, tag))
+        self.tag_results_trigger()
+
+    def show_song_labels(self, dt):
+        # Apply every label that arrived since the last frame in one pass
+        while self.tag_results:
+            generation, index, tag = self.tag_results.popleft()
+            if generation != self.playlist_generation:
+                continue
+            if tag is not None and index < len(self.playlist):
+                self.set_song_row(index, text=song_label(self.playlist[index], tag))
+            self.tags_pending -= 1
+            if self.tags_pending == 0:
+                self.save_caches()
+
+    def cached_tag(self, selection, file_key=None):
+        # file_key is (mtime_ns, size); without it the most recently cached tag is trusted
+        cached = self.tag_cache.get(selection)
+        if cached is not None and (file_key is None or cached[:2] == file_key):
+            return cached
+        return None
+
+    def get_tag(self, selection, file_key=None):
+        cached = self.cached_tag(selection, file_key)
+        if cached is not None:
+            return cached
+        if file_key is None:
+            stat = os.stat(selection)
+            file_key = (stat.st_mtime_ns, stat.st_size)
+        duration = read_header_duration(selection)
+        if duration is not None and os.path.dirname(selection) == self.announce_dir:
+            # Announcements are labelled with their file name
+            info = TagInfo(*file_key, duration, None, None, None, None)
+        elif load_tinytag() is None:
+            # Not cached
+            return TagInfo(*file_key, duration, None, None, None, None)
         else:
-            for i in range(len(self.playlist)):
-                btn = Button(text=self.song_label(self.playlist[i]), size_hint_y=None, height=40,
-                             background_color=self.SONG_BTN_BCKGRD,
-                             color=(1, 1, 1, 1))  # Dark gray background, white text
-                btn.bind(on_press=lambda instance, i=i: self.on_song_button_press(i))
-                self.song_buttons.append(btn)  # Store the button in the list
-                self.button_grid.add_widget(btn)
-
-    def song_duration(self, selection):
-        tag = TinyTag.get(selection)
-        return tag.duration if tag.duration is not None else 300
-
-    def song_label(self, selection) -> str:
-        label = pathlib.Path(selection).stem
-        tag = TinyTag.get(selection)
-
-        if all([tag.title is None, tag.genre is None, tag.artist is None, tag.album is None]):
-            return label
-        title = tag.title if tag.title is not None else "Title Unspecified"
-        genre = tag.genre if tag.genre is not None else "Genre Unspecified"
-        artist = tag.artist if tag.artist is not None else "Artist Unspecified"
-        album = tag.album if tag.album is not None else "Album Unspecified"
-
-        return title + ' / ' + genre + ' / ' + artist + ' / ' + album
+            info = self.read_tag(selection, file_key, duration)
+        with self.cache_lock:
+            self.tag_cache[selection] = info
+            self.tag_cache_dirty = True
+        return info
+
+    def read_tag(self, selection, file_key, duration):
+        tinytag = load_tinytag()
+        try:
+            # Scan for the duration only when the header did not give it
+            tag = tinytag.TinyTag.get(selection, duration=duration is None)
+            if duration is None:
+                duration = tag.duration
+            return TagInfo(*file_key, duration, tag.title, tag.genre, tag.artist, tag.album)
+        except OSError:
+            raise
+        except Exception as e:  # TinyTagException, or e.g. struct.error from a corrupt file
+            # Cache the failure too
+            print(f"Error reading tags of {selection}: {e}")
+            return TagInfo(*file_key, duration, None, None, None, None)
+
+    def load_caches(self, cache_dir):
+        self.cache_dir = cache_dir
+        entries = read_json_file(os.path.join(cache_dir, 'tag_cache.json'))
+        if entries:
+            try:
+                self.tag_cache = {path: TagInfo(*entry) for path, entry in entries.items()}
+            except (AttributeError, TypeError) as e:
+                print(f"Error loading tag cache: {e}")
+
+    def save_caches(self, background=True):
+        if not self.cache_dir:
+            return
+        # Copy under the lock, the tagger threads may still be adding entries
+        with self.cache_lock:
+            if not self.tag_cache_dirty:
+                return
+            tag_cache = dict(self.tag_cache)
+            self.tag_cache_dirty = False
+        if background:
+            future = self.scanner.submit(self.write_tag_cache, tag_cache)
+            future.add_done_callback(self.tag_cache_write_done)
+        else:
+            self.write_tag_cache(tag_cache)
+
+    def write_tag_cache(self, tag_cache):
+        if not write_json_file(os.path.join(self.cache_dir, 'tag_cache.json'), tag_cache):
+            with self.cache_lock:
+                self.tag_cache_dirty = True
+
+    def tag_cache_write_done(self, future):
+        # Cancelled if still queued when the scanner is shut down; on_stop then writes it
+        if future.cancelled():
+            with self.cache_lock:
+                self.tag_cache_dirty = True
+
+    def probe(self, selection):
+        """Return (duration, label) for selection from a single tag lookup."""
+        tag = self.get_tag(selection)
+        duration = tag.duration if tag.duration is not None else 300
+        return duration, song_label(selection, tag)
+
+    def compile_adjustment(self, rule):
+        if isinstance(rule, dict):
+            return lambda n: rule.get(n, rule.get('default', n))
+        if rule in self.selection_rules:
+            return self.selection_rules[rule]
+        print(f"Unknown selection rule: {rule}")
+        return None
 
     def adjust_num_selections(self, dance, num_selections):
-        if dance in "PasoDoble" and num_selections == 1:
-            num_selections = 0
-        elif dance in "PasoDoble" and num_selections in (2, 3):
-            num_selections = 1
-        elif dance in "PasoDoble" and num_selections > 3:
-            num_selections = 2
-        elif dance in ("VWSlow", "JSlow") and num_selections > 1:
-            num_selections = 1
-        elif dance in ('VienneseWaltz', 'Jive') and num_selections > 1:
-            num_selections -= 1
-        elif dance in 'WCS' and num_selections > 2:
-            num_selections = 2
-        elif dance in 'LineDance':
-            num_selections = 100  # include all the line dances
-        return num_selections
+        adjuster = self.selection_adjusters.get(dance)
+        return adjuster(num_selections) if adjuster is not None else num_selections
+
+    def scan_all_dances(self, directory, rescan=False):
+        """Return the music files in every dance folder of directory, walking them in one pass.
+
+        The previous scan in this session is reused while none of the directories it visited
+        have changed, unless rescan is set.
+        """
+        if not rescan and directory == self.music_index_dir and not self.music_index_changed():
+            return self.music_index
+        if not os.path.isdir(directory):
+            # e.g. a drive that isn't mounted; keep the cached tags for when it is back
+            return {}
+        music_index = {}
+        dir_mtimes = {directory: os.stat(directory).st_mtime_ns}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.lower() in self.dance_folders and entry.is_dir():
+                    music_index.setdefault(entry.name.lower(), []).extend(
+                        iter_music_files(entry.path, dir_mtimes))
+        with self.cache_lock:
+            self.music_index = music_index
+            self.music_index_dir = directory
+            self.music_index_dir_mtimes = dir_mtimes
+            # Only a complete scan prunes
+            if None not in dir_mtimes.values():
+                self.forget_removed_tags(directory, music_index)
+        return music_index
+
+    def forget_removed_tags(self, directory, music_index):
+        # Drop cached tags for files that are no longer in directory
+        prefix = os.path.join(directory, '')
+        present = {path for paths in music_index.values() for path in paths}
+        removed = [path for path in list(self.tag_cache) if path.startswith(prefix) and path not in present]
+        for path in removed:
+            del self.tag_cache[path]
+        if removed:
+            self.tag_cache_dirty = True
+
+    def music_index_changed(self):
+        if not self.music_index_dir_mtimes:
+            return True
+        try:
+            return any(os.stat(path).st_mtime_ns != mtime_ns
+                       for path, mtime_ns in self.music_index_dir_mtimes.items())
+        except OSError:
+            return True
 
-    def get_songs(self, directory, dance, num_selections):
-        music = []
+    def find_announcements(self):
+        announcements = {}
+        try:
+            with os.scandir(self.announce_dir) as entries:
+                for entry in entries:
+                    stem, extension = os.path.splitext(entry.name)
+                    if extension.lower() == '.ogg' and entry.is_file():
+                        announcements[stem.lower()] = entry.path
+        except OSError as e:
+            print(f"Error reading announcements: {e}")
+        return announcements
+
+    def get_songs(self, music_index, dance, num_selections):
         num_selections = self.adjust_num_selections(dance, num_selections)
-        subdir = os.path.join(directory, dance)
-
-        if os.path.exists(subdir):
-            for root, dirs, files in os.walk(subdir):
-                for file in files:
-                    if file.endswith(('.mp3', '.ogg', '.m4a', '.flac', '.wav')):
-                        music.append(os.path.join(root, file))
-
-            if music:
-                num = min(num_selections, len(music))
-                if dance != 'LineDance':
-                    selected_songs = random.sample(music, num)
-                else:
-                    selected_songs = sorted(music[:num + 1])
-                if os.path.isfile(os.path.join(self.script_path, 'announce', dance + '.ogg')):
-                    selected_songs.insert(0, os.path.join(self.script_path, 'announce', dance + '.ogg'))
-                else:
-                    selected_songs.insert(0, os.path.join(self.script_path, 'announce', 'Generic.ogg'))
-                return selected_songs
+        paths = music_index.get(dance.lower(), [])
+
+        if paths:
+            num = min(num_selections, len(paths))
+            if dance != 'LineDance':
+                selected = self.rng.sample(range(len(paths)), num)
+            else:
+                selected = list(range(min(num + 1, len(paths))))
+                selected.sort(key=paths.__getitem__)
+            selected_songs = [paths[i] for i in selected]
+            announcement = self.announce_paths.get(dance.lower())
+            if announcement is None:
+                announcement = os.path.join(self.announce_dir, 'Generic.ogg')
+            selected_songs.insert(0, announcement)
+            return selected_songs
 
         return []
 
     def set_practice_type(self, spinner, text):
-        self.play_single_song = False
+        play_single_song = False
+        num_selections = self.num_selections
         if text == '60min':
-            self.dances = self.get_dances('default')
-            self.num_selections = 2
+            dances = self.get_dances('default')
+            num_selections = 2
         elif text == 'B 60min':
-            self.dances = self.get_dances('beginner')
-            self.num_selections = 2
+            dances = self.get_dances('beginner')
+            num_selections = 2
         elif text == 'NC 60min':
-            self.dances = self.get_dances('newcomer')
-            self.num_selections = 2
+            dances = self.get_dances('newcomer')
+            num_selections = 2
         elif text == '90min':
-            self.dances = self.get_dances('default')
-            self.num_selections = 3
+            dances = self.get_dances('default')
+            num_selections = 3
         elif text == 'NC 90min':
-            self.dances = self.get_dances('newcomer')
+            dances = self.get_dances('newcomer')
         elif text == '120min':
-            self.dances = self.get_dances('default')
-            self.num_selections = 4
+            dances = self.get_dances('default')
+            num_selections = 4
         elif text == 'NC 120min':
-            self.dances = self.get_dances('newcomer')
-            self.num_selections = 4
+            dances = self.get_dances('newcomer')
+            num_selections = 4
         elif text == 'LineDance':
-            self.play_single_song = True
-            self.dances = self.get_dances('LineDance')
-            self.num_selections = 100
+            play_single_song = True
+            dances = self.get_dances('LineDance')
+            num_selections = 100
         elif text == 'Misc':
-            #self.play_single_song = True
-            self.dances = self.get_dances('misc')
-            self.num_selections = 100
+            #play_single_song = True
+            dances = self.get_dances('misc')
+            num_selections = 100
         else:
-            self.dances = self.get_dances('default')
-            self.num_selections = 2
+            dances = self.get_dances('default')
+            num_selections = 2
+        self.practice_type = text
+
+        # Nothing to rebuild if the new practice type selects the same playlist parameters
+        if (self.playlist and dances == self.dances and num_selections == self.num_selections
+                and play_single_song == self.play_single_song):
+            return
+
+        self.play_single_song = play_single_song
+        self.dances = dances
+        self.num_selections = num_selections
         self.stop_sound()
         self.update_playlist(self.music_dir)
 
 
 class MusicApp(App):
-    home_dir = os.getenv("USERPROFILE") or os.getenv("HOME") or str(pathlib.Path.home())
+    home_dir = os.getenv("USERPROFILE") or os.getenv("HOME") or os.path.expanduser('~')
     default_music_dir = os.path.join(home_dir, "Music")
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.config = ConfigParser()
-
     def build(self):
         self.settings_cls = SettingsWithSpinner
         self.root = MusicPlayer()
         return self.root
 
     def on_start(self):
+        self.root.load_caches(self.user_data_dir)
         config = self.config
         user_section = 'user'
         if config.has_section(user_section):
-            self.root.volume = config.getfloat(user_section, 'volume', fallback=0.7)
-            self.root.music_dir = config.get(user_section, 'music_dir', fallback=self.default_music_dir)
-            self.root.song_max_playtime = config.getint(user_section, 'song_max_playtime', fallback=210)
-            self.root.practice_type = config.get(user_section, 'practice_type', fallback='60min')
+            # Read the flat user section in one pass, without per-key interpolation
+            settings = dict(config.items(user_section, raw=True))
+            self.root.volume = float(settings.get('volume', 0.7))
+            self.root.music_dir = settings.get('music_dir', self.default_music_dir)
+            self.root.song_max_playtime = int(settings.get('song_max_playtime', 210))
+            self.root.practice_type = settings.get('practice_type', '60min')
+            if self.root.practice_type not in self.root.practice_types:
+                self.root.practice_type = '60min'
 
         self.root.set_practice_type(None, self.root.practice_type)
         if sys.platform == "win32":
             Clock.schedule_once(self.close_console, 1)
 
+    def on_stop(self):
+        # Drop queued tag reads, scans and loads
+        for executor in (self.root.tagger, self.root.loader):
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.root.scanner.shutdown(wait=True, cancel_futures=True)
+        self.root.save_caches(background=False)
+
     def close_console(self, dt):
         ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 0)
+        self.start_priming(dt)
+
+    def start_priming(self, dt):
         # The following code is a workaround for gstreamer starting very slowly because
         # of missing dlls.  Without it, there is a noticeable delay playing the first
-        # selection in the playlist.  We can't fix that so deal with it during startup.
+        # selection in the playlist.  We can't fix that so deal with it during startup,
+        # on a background thread so the window is not blocked while gstreamer loads.
+        if self.root and self.root.building_playlist:
+            Clock.schedule_once(self.start_priming, 0.5)  # wait for the first playlist
+            return
+        if self.root and self.root.playlist and self.root.playlist_idx is not None:
+            selection = self.root.playlist[self.root.playlist_idx]
+            request = self.root.load_request  # changes if a song is loaded or stopped meanwhile
+            threading.Thread(target=self.prime_gstreamer, args=(selection, request), daemon=True).start()
+
+    def prime_gstreamer(self, selection, request):
         try:
-            if self.root and self.root.playlist and self.root.playlist_idx is not None:
-                self.root.sound = SoundLoader.load(self.root.playlist[self.root.playlist_idx])
-                if self.root.sound:
-                    self.root.sound.play()
-                    self.root.sound.stop()
+            sound = SoundLoader.load(selection)
+            if sound:
+                sound.volume = 0  # prime silently; play_sound restores the volume
+                sound.play()
+                sound.stop()
+                Clock.schedule_once(lambda dt: self.keep_primed_sound(sound, selection, request), 0)
         except Exception as e:
-            print(f"Error in close_console: {e}")
+            print(f"Error in prime_gstreamer: {e}")
+
+    def keep_primed_sound(self, sound, selection, request):
+        # Reuse the primed sound unless a song was loaded or stopped while it was priming
+        root = self.root
+        if (root.sound is None and root.load_request == request
+                and root.playlist and root.playlist[root.playlist_idx] == selection):
+            root.sound = sound
+        else:
+            sound.unload()
 
     def build_config(self, config):
         config.setdefaults('user', {
@@ -559,18 +1324,20 @@ class MusicApp(App):
             if key == 'volume':
                 try:
                     volume_value = float(value)
-                    self.root.volume = volume_value
-                    self.root.set_volume(None, volume_value)
-                    self.root.volume_slider.value = volume_value
+                    if self.root.volume_slider.value != volume_value:
+                        # the slider binding calls set_volume, which updates the player volume once
+                        self.root.volume_slider.value = volume_value
+                    else:
+                        self.root.set_volume(None, volume_value)
                 except ValueError:
                     print("Error: volume value is not a float")
             elif key == 'music_dir':
                 self.root.music_dir = value
-                self.root.update_playlist(value)
+                self.root.update_playlist(value, rescan=True)
             elif key == 'song_max_playtime':
                 self.root.song_max_playtime = int(value)
+                self.root.set_song_limits()
             elif key == 'practice_type':
-                self.root.practice_type = value
                 self.root.set_practice_type(None, value)
 
 